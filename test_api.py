@@ -4,12 +4,26 @@ Simple test script to verify the transliteration API is working correctly.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 import json
 import os
 
-def test_api():
+def create_session():
+    """Create a requests session that keeps connections to the API alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def test_api(session=None):
     """Test the transliteration API endpoint."""
     
+    # Reuse pooled connections across requests
+    if session is None:
+        session = create_session()
+    
     # Create a simple test image (you can replace this with an actual image path)
     test_image_path = "/home/yashreddy/Documents/dev/varnan/test_image.jpg"
     
@@ -23,9 +37,10 @@ def test_api():
         # Test the API endpoint
         url = "http://localhost:8000/api/transliterate-image/"
         
+        # Stream the multipart body from disk instead of buffering the whole image
         with open(test_image_path, 'rb') as f:
-            files = {'image': ('test_image.jpg', f, 'image/jpeg')}
-            response = requests.post(url, files=files)
+            encoder = MultipartEncoder(fields={'image': ('test_image.jpg', f, 'image/jpeg')})
+            response = session.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
         
         if response.status_code == 200:
             data = response.json()
@@ -54,9 +69,11 @@ if __name__ == "__main__":
     print("🧪 Testing Varnan Transliteration API...")
     print("=" * 50)
     
+    session = create_session()
+    
     # Check if Django server is running
     try:
-        response = requests.get("http://localhost:8000/admin/")
+        response = session.get("http://localhost:8000/admin/")
         print("✅ Django server is running")
     except:
         print("❌ Django server is not running. Please start it with:")
@@ -64,4 +81,4 @@ if __name__ == "__main__":
         exit(1)
     
     print()
-    test_api()
+    test_api(session)
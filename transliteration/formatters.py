@@ -2,76 +2,151 @@
 Transliteration output formatters for clean, readable text.
 """
 
-import re
+import regex as re
+from functools import lru_cache
 from typing import Dict, Any
 
+# Character mappings for cleaning up transliteration
+CHARACTER_REPLACEMENTS = {
+    # Non-standard characters to standard ones
+    'ò': 'o',
+    'ḻ': 'l', 
+    'ṅ': 'ng',
+    'ṇ': 'n',
+    'ṭ': 't',
+    'ḍ': 'd',
+    'ṣ': 'sh',
+    'ṃ': 'm',
+    'ḥ': 'h',
+    'ṁ': 'm',
+    
+    # Telugu specific
+    'ḷ': 'l',
+    'ṛ': 'r',
+    'ṝ': 'r',
+    
+    # Clean up mixed case issues
+    'I': 'i',
+    'A': 'a',
+    'U': 'u',
+    'E': 'e',
+    'O': 'o',
+}
+
+# Vowel length mappings for user-friendly format
+VOWEL_LENGTH_MAPPINGS = {
+    'ī': 'ee',
+    'ā': 'aa', 
+    'ū': 'uu',
+    'ē': 'ee',
+    'ō': 'oo',
+    'ṛ': 'ri',
+    'ṝ': 'ri',
+}
+
+# Common word corrections for better readability
+WORD_CORRECTIONS = {
+    'dIpòvaLi': 'Deepavali',
+    'dīpòvaḻi': 'Deepavali',
+    'dIpAvalI': 'Deepavali',
+    'dīpāvalī': 'Deepavali',
+    'dIpAvaLi': 'Deepavali',
+    'dīpāvaḻi': 'Deepavali',
+    'avItAlat': 'Aveetalat',
+    'avītālat': 'Aveetalat',
+    'dipavaLi': 'Deepavali',  # Handle partial corrections
+}
+
+# English to Indian script common corrections
+ENGLISH_TO_INDIAN_CORRECTIONS = {
+    'Changes': 'चेंजेस',
+    'Bhatta': 'भट्टा',
+    'Fall': 'फॉल',
+    'Hello': 'हेलो',
+    'India': 'इंडिया',
+    'Welcome': 'वेलकम',
+}
+
+# Phonetic hints for long vowels in the pronunciation guide
+PRONUNCIATION_HINTS = {
+    'aa': 'aa (as in car)',
+    'ee': 'ee (as in see)',
+    'ii': 'ii (as in ski)',
+    'oo': 'oo (as in too)',
+    'uu': 'uu (as in blue)',
+}
+
+# Target script type for the script names used by the API; other names fall back
+# to keyword matching in TransliterationFormatter._classify_script
+SCRIPT_CLASSIFICATION = {
+    'Roman': 'roman',
+    'English': 'roman',
+    'ITRANS': 'roman',
+    'Latin': 'roman',
+    'IAST': 'iast',
+    'Devanagari': 'other',
+    'Devanagari (Hindi)': 'other',
+    'Devanagari (Marathi)': 'other',
+    'Tamil': 'other',
+    'Telugu': 'other',
+    'Kannada': 'other',
+    'Malayalam': 'other',
+    'Gujarati': 'other',
+    'Bengali': 'other',
+    'Gurmukhi': 'other',
+    'Oriya': 'other',
+}
+
+# Translation tables and patterns derived from the mappings above, built once at import
+_CHAR_REPLACE_TABLE = str.maketrans(CHARACTER_REPLACEMENTS)
+_VOWEL_LENGTH_TABLE = str.maketrans(VOWEL_LENGTH_MAPPINGS)
+
+# ASCII lookup table: 1 for vowels (either case), 0 otherwise
+_VOWEL_MASK = bytes(1 if chr(i).lower() in 'aeiou' else 0 for i in range(128))
+
+# Single case-insensitive alternation over all corrections, longest first
+_WORD_CORRECTIONS_RE = re.compile(
+    '|'.join(re.escape(word) for word in sorted(WORD_CORRECTIONS, key=len, reverse=True)),
+    re.IGNORECASE
+)
+_WORD_CORRECTIONS_LOWER = {
+    incorrect.lower(): correct for incorrect, correct in WORD_CORRECTIONS.items()
+}
+
+# Anything the non-English cleaning stages would change: non-ASCII characters
+# (Indian script, diacritics), capital vowels, or a word correction
+_NEEDS_CLEANING_RE = re.compile(
+    r'[^\x00-\x7f]|[AEIOU]|(?i:' + _WORD_CORRECTIONS_RE.pattern + ')'
+)
+
+# Any character from the Indian script Unicode blocks
+_INDIAN_SCRIPT_RE = re.compile(
+    r'[\p{InDevanagari}\p{InBengali}\p{InGurmukhi}\p{InGujarati}'
+    r'\p{InTamil}\p{InTelugu}\p{InKannada}\p{InMalayalam}]'
+)
+
+# Patterns used by _clean_indian_script
+_CAPS_BEFORE_INDIAN_RE = re.compile(f'([A-Z])({_INDIAN_SCRIPT_RE.pattern})')
+_CAPS_AFTER_INDIAN_RE = re.compile(f'({_INDIAN_SCRIPT_RE.pattern})([A-Z])')
+_STANDALONE_CAPS_RE = re.compile(r'\b[A-Z]\b')
+
+# A hint never contains a different long vowel, so one pass matches sequential replaces
+_LONG_VOWEL_RE = re.compile('|'.join(PRONUNCIATION_HINTS))
+
+# The regex module's \s excludes U+001C-U+001F, which str.split() treats as whitespace
+_WORD_RE = re.compile(r'[^\s\x1c-\x1f]+')
+_WHITESPACE_RE = re.compile(r'[\s\x1c-\x1f]+')
+
 class TransliterationFormatter:
     """
     Formats transliteration output to be more readable and user-friendly.
     """
-    
-    def __init__(self):
-        # Character mappings for cleaning up transliteration
-        self.character_replacements = {
-            # Non-standard characters to standard ones
-            'ò': 'o',
-            'ḻ': 'l', 
-            'ṅ': 'ng',
-            'ṇ': 'n',
-            'ṭ': 't',
-            'ḍ': 'd',
-            'ṣ': 'sh',
-            'ṃ': 'm',
-            'ḥ': 'h',
-            'ṁ': 'm',
-            
-            # Telugu specific
-            'ḷ': 'l',
-            'ṛ': 'r',
-            'ṝ': 'r',
-            
-            # Clean up mixed case issues
-            'I': 'i',
-            'A': 'a',
-            'U': 'u',
-            'E': 'e',
-            'O': 'o',
-        }
-        
-        # Vowel length mappings for user-friendly format
-        self.vowel_length_mappings = {
-            'ī': 'ee',
-            'ā': 'aa', 
-            'ū': 'uu',
-            'ē': 'ee',
-            'ō': 'oo',
-            'ṛ': 'ri',
-            'ṝ': 'ri',
-        }
-        
-        # Common word corrections for better readability
-        self.word_corrections = {
-            'dIpòvaLi': 'Deepavali',
-            'dīpòvaḻi': 'Deepavali',
-            'dIpAvalI': 'Deepavali',
-            'dīpāvalī': 'Deepavali',
-            'dIpAvaLi': 'Deepavali',
-            'dīpāvaḻi': 'Deepavali',
-            'avItAlat': 'Aveetalat',
-            'avītālat': 'Aveetalat',
-            'dipavaLi': 'Deepavali',  # Handle partial corrections
-        }
-        
-        # English to Indian script common corrections
-        self.english_to_indian_corrections = {
-            'Changes': 'चेंजेस',
-            'Bhatta': 'भट्टा',
-            'Fall': 'फॉल',
-            'Hello': 'हेलो',
-            'India': 'इंडिया',
-            'Welcome': 'वेलकम',
-        }
 
+    character_replacements = CHARACTER_REPLACEMENTS
+    vowel_length_mappings = VOWEL_LENGTH_MAPPINGS
+    word_corrections = WORD_CORRECTIONS
+    english_to_indian_corrections = ENGLISH_TO_INDIAN_CORRECTIONS
+    
     def clean_transliteration(self, text: str, target_script: str) -> str:
         """
         Clean and format transliteration output based on target script.
@@ -86,79 +161,53 @@ class TransliterationFormatter:
         if not text:
             return text
         
+        is_english_target = target_script in ['roman', 'english', 'ITRANS', 'Latin'] or str(target_script) in ['ITRANS', 'Latin']
+        
+        # Plain ASCII text with nothing to replace only needs whitespace normalization,
+        # unless English formatting (title case) still has to be applied
+        if not is_english_target and not _NEEDS_CLEANING_RE.search(text):
+            return _WHITESPACE_RE.sub(' ', text).strip()
+        
         # Check if text is in Indian script (should not apply English formatting)
-        is_indian_script = any('\u0900' <= char <= '\u097f' for char in text) or \
-                          any('\u0c00' <= char <= '\u0c7f' for char in text) or \
-                          any('\u0b80' <= char <= '\u0bff' for char in text) or \
-                          any('\u0c80' <= char <= '\u0cff' for char in text) or \
-                          any('\u0a80' <= char <= '\u0aff' for char in text)
+        is_indian_script = self._has_indian_script(text)
         
         # If text is in Indian script, clean it differently
         if is_indian_script:
             cleaned_text = self._clean_indian_script(text)
         else:
             # Apply word corrections first
-            cleaned_text = text
-            for incorrect, correct in self.word_corrections.items():
-                if incorrect.lower() in cleaned_text.lower():
-                    cleaned_text = cleaned_text.replace(incorrect, correct)
-            
-            # Apply English to Indian script corrections if target is Indian script
-            # Check if we have mixed English/Indian script text that needs correction
-            has_english_caps = any(c.isupper() and c.isalpha() for c in cleaned_text)
-            has_indian_script = any('\u0900' <= char <= '\u097f' for char in cleaned_text) or \
-                               any('\u0c00' <= char <= '\u0c7f' for char in cleaned_text) or \
-                               any('\u0b80' <= char <= '\u0bff' for char in cleaned_text)
-            
-            if has_english_caps and has_indian_script:
-                # Apply corrections for common English words in mixed text
-                for english_word, indian_word in self.english_to_indian_corrections.items():
-                    if english_word in cleaned_text:
-                        cleaned_text = cleaned_text.replace(english_word, indian_word)
+            cleaned_text = _WORD_CORRECTIONS_RE.sub(
+                lambda m: _WORD_CORRECTIONS_LOWER[m.group(0).lower()], text
+            )
             
             # Clean up characters
-            for old_char, new_char in self.character_replacements.items():
-                cleaned_text = cleaned_text.replace(old_char, new_char)
+            cleaned_text = cleaned_text.translate(_CHAR_REPLACE_TABLE)
             
             # For Roman/English output, apply additional formatting
-            if target_script in ['roman', 'english', 'ITRANS', 'Latin'] or str(target_script) in ['ITRANS', 'Latin']:
+            if is_english_target:
                 cleaned_text = self._format_for_english(cleaned_text)
         
         # Clean up extra spaces and normalize
-        cleaned_text = ' '.join(cleaned_text.split())
-        
-        return cleaned_text
+        return _WHITESPACE_RE.sub(' ', cleaned_text).strip()
+
+    def _has_indian_script(self, text: str) -> bool:
+        """
+        Check whether text contains any Indian script character in a single pass.
+        """
+        return _INDIAN_SCRIPT_RE.search(text) is not None
 
     def _clean_indian_script(self, text: str) -> str:
         """
         Clean text that's already in Indian script (remove mixed capitalization).
         """
-        import re
-        
-        # Define Unicode ranges for Indian scripts
-        devanagari_range = r'[\u0900-\u097f]'
-        telugu_range = r'[\u0c00-\u0c7f]'
-        tamil_range = r'[\u0b80-\u0bff]'
-        kannada_range = r'[\u0c80-\u0cff]'
-        malayalam_range = r'[\u0d00-\u0d7f]'
-        gujarati_range = r'[\u0a80-\u0aff]'
-        bengali_range = r'[\u0980-\u09ff]'
-        punjabi_range = r'[\u0a00-\u0a7f]'
-        
-        # Combined Indian script pattern
-        indian_scripts = f"({devanagari_range}|{telugu_range}|{tamil_range}|{kannada_range}|{malayalam_range}|{gujarati_range}|{bengali_range}|{punjabi_range})"
-        
         # Replace English capital letters before Indian script characters
-        cleaned = re.sub(f'([A-Z])({indian_scripts})', lambda m: m.group(1).lower() + m.group(2), text)
+        cleaned = _CAPS_BEFORE_INDIAN_RE.sub(lambda m: m.group(1).lower() + m.group(2), text)
         
         # Replace English capital letters after Indian script characters  
-        cleaned = re.sub(f'({indian_scripts})([A-Z])', lambda m: m.group(1) + m.group(2).lower(), cleaned)
-        
-        # Replace English capital letters between Indian script characters
-        cleaned = re.sub(f'({indian_scripts})([A-Z])({indian_scripts})', lambda m: m.group(1) + m.group(2).lower() + m.group(3), cleaned)
+        cleaned = _CAPS_AFTER_INDIAN_RE.sub(lambda m: m.group(1) + m.group(2).lower(), cleaned)
         
         # Remove standalone English capital letters
-        cleaned = re.sub(r'\b[A-Z]\b', lambda m: m.group(0).lower(), cleaned)
+        cleaned = _STANDALONE_CAPS_RE.sub(lambda m: m.group(0).lower(), cleaned)
         
         return cleaned
 
@@ -167,28 +216,32 @@ class TransliterationFormatter:
         Format text specifically for English/Roman output.
         """
         # Apply vowel length mappings for user-friendly format
-        for diacritic, replacement in self.vowel_length_mappings.items():
-            text = text.replace(diacritic, replacement)
-        
-        # Convert to title case for proper nouns (words that look like names/places)
-        words = text.split()
-        formatted_words = []
+        text = text.translate(_VOWEL_LENGTH_TABLE)
         
-        for word in words:
-            # Skip if already properly formatted (contains uppercase)
-            if word.isupper() or (word[0].isupper() and word[1:].islower()):
-                formatted_words.append(word)
-                continue
-                
-            # If word contains long vowels or looks like a proper noun, use title case
-            if (any(char in word for char in ['aa', 'ee', 'ii', 'oo', 'uu']) or 
-                len(word) > 4 or 
-                word.islower()):
-                formatted_words.append(word.title())
-            else:
-                formatted_words.append(word)
+        # Convert to title case for proper nouns (words that look like names/places).
+        # Every all-lowercase word gets title case, so an all-lowercase text can be
+        # title-cased in one pass; otherwise decide word by word.
+        if text.islower():
+            return text.title()
+        return _WORD_RE.sub(self._title_case_word, text)
+
+    @staticmethod
+    def _title_case_word(match: re.Match) -> str:
+        """
+        Title-case a single word unless it is already properly formatted.
+        """
+        word = match.group(0)
         
-        return ' '.join(formatted_words)
+        # Skip if already properly formatted (contains uppercase)
+        if word.isupper() or (word[0].isupper() and word[1:].islower()):
+            return word
+            
+        # If word contains long vowels or looks like a proper noun, use title case
+        if (word.islower() or 
+            len(word) > 4 or 
+            any(vowel in word for vowel in ['aa', 'ee', 'ii', 'oo', 'uu'])):
+            return word.title()
+        return word
 
     def format_transliterations(self, transliterations: Dict[str, str]) -> Dict[str, str]:
         """
@@ -203,18 +256,24 @@ class TransliterationFormatter:
         formatted_transliterations = {}
         
         for script_name, text in transliterations.items():
-            # Determine target script type
-            if any(keyword in script_name.lower() for keyword in ['roman', 'english', 'itrans', 'latin']):
-                target_script = 'roman'
-            elif 'iast' in script_name.lower():
-                target_script = 'iast'
-            else:
-                target_script = 'other'
-            
+            target_script = SCRIPT_CLASSIFICATION.get(script_name) or self._classify_script(script_name)
             formatted_transliterations[script_name] = self.clean_transliteration(text, target_script)
         
         return formatted_transliterations
 
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _classify_script(script_name: str) -> str:
+        """
+        Determine the target script type for a script name.
+        """
+        lowered = script_name.lower()
+        if any(keyword in lowered for keyword in ['roman', 'english', 'itrans', 'latin']):
+            return 'roman'
+        if 'iast' in lowered:
+            return 'iast'
+        return 'other'
+
     def add_pronunciation_guide(self, text: str, target_script: str) -> Dict[str, str]:
         """
         Add pronunciation guide for complex transliterations.
@@ -233,11 +292,7 @@ class TransliterationFormatter:
             pronunciation = text.lower()
             
             # Replace long vowels with phonetic equivalents
-            pronunciation = pronunciation.replace('aa', 'aa (as in car)')
-            pronunciation = pronunciation.replace('ee', 'ee (as in see)')
-            pronunciation = pronunciation.replace('ii', 'ii (as in ski)')
-            pronunciation = pronunciation.replace('oo', 'oo (as in too)')
-            pronunciation = pronunciation.replace('uu', 'uu (as in blue)')
+            pronunciation = _LONG_VOWEL_RE.sub(lambda m: PRONUNCIATION_HINTS[m.group(0)], pronunciation)
             
             # Add syllable breaks for long words
             if len(text.split()) == 1 and len(text) > 6:
@@ -253,20 +308,23 @@ class TransliterationFormatter:
         """
         # Simple heuristic: break at vowel-consonant boundaries
         syllables = []
-        current_syllable = ""
+        current_syllable = []
+        
+        # Classify every character once instead of lowercasing it twice per step
+        is_vowel = [c < 128 and _VOWEL_MASK[c] for c in map(ord, word)]
         
         for i, char in enumerate(word):
-            current_syllable += char
+            current_syllable.append(char)
             
             # Break after vowel if next char is consonant and not end of word
             if (i < len(word) - 1 and 
-                char.lower() in 'aeiou' and 
-                word[i + 1].lower() not in 'aeiou'):
-                syllables.append(current_syllable)
-                current_syllable = ""
+                is_vowel[i] and 
+                not is_vowel[i + 1]):
+                syllables.append(''.join(current_syllable))
+                current_syllable.clear()
         
         if current_syllable:
-            syllables.append(current_syllable)
+            syllables.append(''.join(current_syllable))
         
         return '-'.join(syllables)
 
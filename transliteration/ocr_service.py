@@ -0,0 +1,201 @@
+"""
+Pipelined OCR service for high-volume deployments.
+
+Requests flow through three stages, each running in its own worker thread with a
+bounded queue in between:
+
+1. decode: turn the uploaded bytes into an RGB image array
+2. OCR: run EasyOCR, micro-batching images that arrive close together
+3. text: combine the recognised fragments and run the caller's post-processing
+   (language detection + transliteration)
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Runs of whitespace (including newlines) in OCR output
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class OCRJob:
+    """
+    A single image submitted to the pipeline. Call wait() for its result.
+    """
+
+    def __init__(self, image_bytes, process_text=None):
+        self.image_bytes = image_bytes
+        self.process_text = process_text
+        self.image = None
+        self.ocr_results = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        # Drop intermediate data as soon as the job is complete
+        self.image_bytes = None
+        self.image = None
+        self.ocr_results = None
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job is processed.
+
+        Returns:
+            Tuple of (extracted_text, processed) where processed is the return value of
+            process_text, or None if no text was extracted or no callback was given
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("OCR job did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class OCRPipeline:
+    """
+    Three-stage decode -> OCR -> text pipeline around a shared EasyOCR reader.
+
+    The OCR stage collects up to batch_size decoded images and runs images of the same
+    size through a single readtext_batched call so the model overhead is paid once per
+    batch. It only waits (at most max_wait seconds) for more images when others are
+    already queued, so a lone request is never delayed. after_ocr, if given, is called
+    after every EasyOCR call.
+
+    The worker threads start on the first submit in each process, so the pipeline can
+    be created before a pre-forking server (e.g. gunicorn --preload) forks its workers.
+    """
+
+    def __init__(self, reader, batch_size=8, max_wait=0.05, queue_size=32, after_ocr=None):
+        self.reader = reader
+        self.after_ocr = after_ocr
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.queue_size = queue_size
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._start_lock:
+            if self._pid == pid:
+                return
+            # Threads do not survive a fork, so each process gets fresh queues and workers
+            self._decode_queue = queue.Queue(maxsize=self.queue_size)
+            self._ocr_queue = queue.Queue(maxsize=self.queue_size)
+            self._text_queue = queue.Queue(maxsize=self.queue_size)
+            for target, name in [(self._decode_stage, 'ocr-decode'),
+                                 (self._ocr_stage, 'ocr-inference'),
+                                 (self._text_stage, 'ocr-text')]:
+                threading.Thread(target=target, name=name, daemon=True).start()
+            self._pid = pid
+
+    def submit(self, image_bytes, process_text=None):
+        """
+        Queue an encoded image for OCR.
+
+        Args:
+            image_bytes: Encoded image data (e.g. the uploaded JPEG/PNG file)
+            process_text: Optional callable applied to the extracted text in the text stage
+
+        Returns:
+            The OCRJob to wait on
+        """
+        self._ensure_started()
+        job = OCRJob(image_bytes, process_text)
+        # Blocks when the pipeline is saturated, applying back-pressure to callers
+        self._decode_queue.put(job)
+        return job
+
+    def _decode_stage(self):
+        while True:
+            job = self._decode_queue.get()
+            try:
+                image = cv2.imdecode(np.frombuffer(job.image_bytes, np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError("Could not read image")
+                # Swap channels in place rather than allocating a second full-size image
+                job.image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+            except Exception as e:
+                job.finish(error=e)
+                continue
+            self._ocr_queue.put(job)
+
+    def _next_batch(self):
+        batch = [self._ocr_queue.get()]
+        # Nothing else is waiting (e.g. a sync worker serving one request at a time):
+        # waiting for company would only add latency
+        if self._ocr_queue.empty():
+            return batch
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._ocr_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _ocr_stage(self):
+        while True:
+            batch = self._next_batch()
+
+            # Only same-sized images can be stacked without resizing them
+            groups = {}
+            for job in batch:
+                groups.setdefault(job.image.shape, []).append(job)
+
+            for jobs in groups.values():
+                try:
+                    if len(jobs) == 1:
+                        all_results = [self.reader.readtext(jobs[0].image)]
+                    else:
+                        all_results = self.reader.readtext_batched([job.image for job in jobs])
+                except Exception as e:
+                    for job in jobs:
+                        job.finish(error=e)
+                    continue
+                finally:
+                    self._run_after_ocr()
+
+                for job, ocr_results in zip(jobs, all_results):
+                    job.ocr_results = ocr_results
+                    self._text_queue.put(job)
+
+    def _run_after_ocr(self):
+        # A failing hook must not kill the OCR thread and stall every later job
+        if self.after_ocr is None:
+            return
+        try:
+            self.after_ocr()
+        except Exception as e:
+            print(f"OCR after_ocr hook failed: {e}")
+
+    def _text_stage(self):
+        while True:
+            job = self._text_queue.get()
+            try:
+                # Combine fragments and collapse extra whitespace/newlines
+                extracted_text = _WHITESPACE_RE.sub(
+                    ' ', ' '.join(text for _, text, _ in job.ocr_results)
+                ).strip()
+                processed = None
+                if extracted_text and job.process_text is not None:
+                    processed = job.process_text(extracted_text)
+            except Exception as e:
+                job.finish(error=e)
+                continue
+            job.finish(result=(extracted_text, processed))
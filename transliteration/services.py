@@ -0,0 +1,394 @@
+"""
+OCR and transliteration service shared by the API views.
+
+Holds the EasyOCR reader, the language identification model, the worker pools and
+caches, and the functions that turn an uploaded image into its transliterations.
+"""
+
+import gc
+import itertools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional
+from django.conf import settings
+import easyocr
+import torch
+from PIL import Image
+from langdetect import detect
+from aksharamukha import GeneralMap
+from aksharamukha.transliterate import convert, process
+import cv2
+import numpy as np
+from .formatters import formatter
+from .ocr_service import OCRPipeline
+
+# Initialize EasyOCR reader globally (to prevent reloading on every request)
+# Using Hindi + English for better Hindi text detection
+# quantize: int8 dynamic quantization of the detector and recognizer for CPU inference
+reader = easyocr.Reader(['hi', 'en'], gpu=False, quantize=True, cudnn_benchmark=True)
+
+# Maximum number of images accepted by a single batch request
+MAX_BATCH_IMAGES = 16
+
+# Seconds a request waits for an image to come out of the OCR pipeline
+OCR_TIMEOUT = 120
+
+# Warm up EasyOCR with dummy inferences so the first real request does not pay for
+# backend kernel selection; a failure here must never prevent the app from loading
+try:
+    _warmup_image = np.zeros((600, 800, 3), dtype=np.uint8)
+    reader.readtext(_warmup_image)
+    reader.readtext_batched([_warmup_image, _warmup_image])
+    del _warmup_image
+except Exception as e:
+    print(f"EasyOCR warm-up failed: {e}")
+
+# Language code to script mapping for Aksharamukha
+LANGUAGE_TO_SCRIPT = MappingProxyType({
+    'hi': 'Devanagari',    # Hindi
+    'mr': 'Devanagari',    # Marathi (uses Devanagari script)
+    'ta': 'Tamil',         # Tamil
+    'te': 'Telugu',        # Telugu
+    'kn': 'Kannada',       # Kannada
+    'ml': 'Malayalam',     # Malayalam
+    'gu': 'Gujarati',      # Gujarati
+    'bn': 'Bengali',       # Bengali
+    'pa': 'Gurmukhi',      # Punjabi
+    'or': 'Oriya',         # Odia
+    'as': 'Bengali',       # Assamese (using Bengali script)
+    'en': 'ITRANS',        # English (use ITRANS for transliteration)
+    # Further Indic labels returned by the fastText lid.176 model
+    'ne': 'Devanagari',    # Nepali
+    'sa': 'Devanagari',    # Sanskrit
+    'mai': 'Devanagari',   # Maithili
+    'bh': 'Devanagari',    # Bihari
+    'new': 'Devanagari',   # Newari
+    'gom': 'Devanagari',   # Goan Konkani
+    'dty': 'Devanagari',   # Doteli
+    'bpy': 'Bengali',      # Bishnupriya Manipuri (uses Bengali script)
+})
+
+# Scripts of the consecutive 128-codepoint Unicode blocks from U+0900 to U+0D7F
+_BLOCK_SCRIPTS = (
+    'Devanagari', 'Bengali', 'Gurmukhi', 'Gujarati', 'Oriya',
+    'Tamil', 'Telugu', 'Kannada', 'Malayalam',
+)
+_INDIC_CHAR_RE = re.compile('[\u0900-\u0d7f]')
+
+# Target scripts for transliteration (display name -> Aksharamukha script code)
+TARGET_SCRIPTS = MappingProxyType({
+    'Devanagari (Hindi)': 'Devanagari',
+    'Devanagari (Marathi)': 'Devanagari',
+    'Tamil': 'Tamil',
+    'Telugu': 'Telugu',
+    'Kannada': 'Kannada',
+    'Malayalam': 'Malayalam',
+    'Gujarati': 'Gujarati',
+    'Bengali': 'Bengali',
+    'Gurmukhi': 'Gurmukhi',
+    'Oriya': 'Oriya',
+    'Roman': 'ITRANS'
+})
+
+# Detected languages that are treated as English text
+_EN_LIKE = frozenset({'en', '', None, 'unknown'})
+
+# Language detection accuracy plateaus after a couple of hundred characters, so only
+# this many leading characters of the OCR output are classified
+LANGUAGE_DETECTION_PREFIX = 256
+
+# fastText language identification model (lid.176.ftz), loaded once at import;
+# langdetect is used when fastText or the model file is not available
+try:
+    import fasttext
+    _LANGUAGE_ID_MODEL = fasttext.load_model(str(settings.LANGUAGE_ID_MODEL_PATH))
+except Exception as e:
+    print(f"fastText language identification unavailable, using langdetect: {e}")
+    _LANGUAGE_ID_MODEL = None
+
+# EasyOCR/torch keep growing a long-running worker's memory across readtext calls;
+# every OCR_CALLS_PER_CLEANUP calls, garbage collect and release cached allocator blocks
+OCR_CALLS_PER_CLEANUP = 500
+_OCR_CALLS = itertools.count(1)
+
+
+def _release_ocr_memory():
+    if next(_OCR_CALLS) % OCR_CALLS_PER_CLEANUP == 0:
+        gc.collect()
+        torch.cuda.empty_cache()
+
+
+# Decode -> micro-batched OCR -> text pipeline shared by all endpoints. Its single OCR
+# thread runs one EasyOCR inference at a time, so inference never competes for the CPU
+_OCR_PIPELINE = OCRPipeline(
+    reader, batch_size=8, max_wait=0.05, queue_size=32, after_ocr=_release_ocr_memory
+)
+
+# Worker pool for the independent per-script transliterations of a request
+_TRANSLITERATION_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+@lru_cache(maxsize=1024)
+def _detect_language(text):
+    """
+    Detect the language code of text with fastText, falling back to langdetect.
+    Cached per text, up to 1024 entries.
+    """
+    if _LANGUAGE_ID_MODEL is not None:
+        try:
+            # The list form of predict avoids fastText 0.9.3's single-string path,
+            # which calls np.array(..., copy=False) and fails on NumPy 2
+            labels, _ = _LANGUAGE_ID_MODEL.predict([text.replace('\n', ' ')], k=1)
+            return labels[0][0].replace('__label__', '')
+        except Exception as e:
+            print(f"fastText language identification failed, using langdetect: {e}")
+    return detect(text)
+
+
+def _script_from_text(text):
+    """
+    Script of the first Indian script character in text, or None if there is none.
+    Used when the detected language has no entry in LANGUAGE_TO_SCRIPT.
+    """
+    match = _INDIC_CHAR_RE.search(text)
+    if match is None:
+        return None
+    return _BLOCK_SCRIPTS[(ord(match.group()) - 0x0900) // 0x80]
+
+
+@lru_cache(maxsize=None)
+def _transliterator(source_script, script_code):
+    """
+    Return a function transliterating text from source_script to script_code.
+    Equivalent to aksharamukha's process(), whose front end re-resolves the script
+    names and introspects its pre/post-processing option modules on every call;
+    that only depends on the script pair, so it is done once per pair here.
+    """
+    script_names = GeneralMap.IndicScripts + GeneralMap.LatinScripts
+    
+    def resolve(script):
+        # Same case-insensitive lookup of the canonical name as process()
+        matches = [name for name in script_names if name.lower() == script.lower()]
+        return matches[0] if matches else script
+    
+    src, tgt = resolve(source_script), resolve(script_code)
+    
+    def transliterate(text):
+        # convert() is internal to aksharamukha (checked against 2.3); use the public
+        # process() if its call no longer works
+        try:
+            return convert(src, tgt, text, True, [], [])
+        except Exception:
+            return process(source_script, script_code, text)
+    
+    return transliterate
+
+
+@lru_cache(maxsize=2048)
+def _transliterate_one(source_script, script_code, text):
+    """
+    Transliterate text into a single target script and format it for display.
+    Falls back to ITRANS as the source script if the first attempt fails and
+    returns None if both attempts fail.
+    
+    Cached per (source_script, script_code, text), up to 2048 entries, so a repeated
+    upload of the same image skips aksharamukha entirely.
+    """
+    try:
+        transliterated_text = _transliterator(source_script, script_code)(text)
+        # Apply formatting for better readability
+        return formatter.clean_transliteration(transliterated_text, script_code)
+    except Exception as e:
+        print(f"Transliteration failed for {script_code}: {e}")
+        # If transliteration fails, try a fallback approach
+        try:
+            # Try direct transliteration from ITRANS
+            transliterated_text = _transliterator('ITRANS', script_code)(text)
+            return formatter.clean_transliteration(transliterated_text, script_code)
+        except Exception as e2:
+            print(f"Fallback transliteration also failed for {script_code}: {e2}")
+            return None
+
+
+def preprocess_image_for_ocr(image_path, mode='clahe'):
+    """
+    Preprocess image to improve OCR accuracy.
+    
+    Only the requested variant is computed:
+    'grayscale', 'otsu', 'adaptive', 'morph', 'denoise' or 'clahe' (default).
+    """
+    try:
+        # Read image with OpenCV
+        img = cv2.imread(image_path)
+        if img is None:
+            raise ValueError("Could not read image")
+        
+        # Convert to grayscale
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        
+        if mode == 'grayscale':
+            return gray
+        
+        if mode in ('otsu', 'morph'):
+            # Gaussian blur + threshold
+            blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+            # Morphological closing with a 1x1 kernel ('morph') leaves the image
+            # unchanged, so both modes return the thresholded image as is
+            return cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+        
+        if mode == 'adaptive':
+            return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+        
+        if mode == 'denoise':
+            return cv2.fastNlMeansDenoising(gray)
+        
+        if mode == 'clahe':
+            # Contrast enhancement
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+            return clahe.apply(gray)
+        
+        raise ValueError(f"Unknown preprocessing mode: {mode}")
+        
+    except Exception as e:
+        print(f"Image preprocessing failed: {e}")
+        # Return grayscale PIL image as fallback
+        try:
+            pil_image = Image.open(image_path).convert('L')
+            # Convert PIL to numpy array for consistency
+            return np.array(pil_image)
+        except Exception as e2:
+            print(f"Fallback image loading also failed: {e2}")
+            return None
+
+
+@dataclass
+class TransliterationResult:
+    """
+    Text extracted from an image together with its transliterations.
+
+    scripts maps each Aksharamukha script code to its formatted transliteration, or
+    to None if both the direct and the fallback attempt failed for that script.
+    error describes why the image could not be processed at all (batch requests only).
+    """
+    original_text: str
+    detected_language: Optional[str] = None
+    scripts: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def transliterations(self):
+        """
+        Transliterations by display name; failed scripts fall back to the original text.
+        """
+        return {
+            script_name: self.scripts[script_code] if self.scripts[script_code] is not None else self.original_text
+            for script_name, script_code in TARGET_SCRIPTS.items()
+        }
+
+
+def transliterate_text(extracted_text, source_hint=None):
+    """
+    Detect the language of OCR output and transliterate it to all target scripts.
+
+    Args:
+        extracted_text: Text extracted from an image
+        source_hint: Optional source language code chosen by the user. The detected
+            language is preferred unless it is unknown, and English wins if either
+            the detection or the hint says English.
+
+    Returns:
+        TransliterationResult
+    """
+    # Detect language
+    try:
+        detected_language = _detect_language(extracted_text[:LANGUAGE_DETECTION_PREFIX])
+    except:
+        # Fallback to user selection, if any
+        detected_language = source_hint if source_hint is not None else 'unknown'
+    
+    if source_hint is None:
+        # Determine source script - for English text, use ITRANS as source
+        source_language = detected_language
+        is_english = detected_language in _EN_LIKE
+        if is_english:
+            source_script = 'ITRANS'
+        else:
+            source_script = (LANGUAGE_TO_SCRIPT.get(detected_language)
+                             or _script_from_text(extracted_text) or 'ITRANS')
+    else:
+        # Use detected language if it's more reliable, otherwise use user selection
+        # For English detection, prioritize user selection if they specifically chose English
+        if detected_language == 'en' or source_hint == 'en':
+            source_language = 'en'
+        else:
+            source_language = detected_language if detected_language != 'unknown' else source_hint
+        is_english = source_language == 'en'
+        source_script = (LANGUAGE_TO_SCRIPT.get(source_language)
+                         or _script_from_text(extracted_text) or 'Devanagari')
+    
+    # Perform transliteration once per unique target script, in parallel; display
+    # names sharing a script code (Hindi and Marathi Devanagari) reuse the result
+    futures = {}
+    for script_code in dict.fromkeys(TARGET_SCRIPTS.values()):
+        # For English text, we need special handling
+        if is_english and script_code == 'ITRANS':
+            # For ITRANS/Roman, keep the original text and only format it; aksharamukha's
+            # ITRANS -> ITRANS conversion is not an identity (e.g. 'welcome' -> 'velcome')
+            futures[script_code] = _TRANSLITERATION_POOL.submit(
+                formatter.clean_transliteration, extracted_text, script_code
+            )
+        else:
+            futures[script_code] = _TRANSLITERATION_POOL.submit(
+                _transliterate_one, source_script, script_code, extracted_text
+            )
+    
+    return TransliterationResult(
+        original_text=extracted_text,
+        detected_language=source_language,
+        scripts={script_code: future.result() for script_code, future in futures.items()}
+    )
+
+
+def ocr_and_transliterate(image_bytes, source_hint=None):
+    """
+    Extract text from an encoded image and transliterate it to all target scripts.
+
+    Args:
+        image_bytes: Encoded image data (e.g. the uploaded JPEG/PNG file)
+        source_hint: Optional source language code chosen by the user (see transliterate_text)
+
+    Returns:
+        TransliterationResult, whose original_text is empty if no text was extracted
+    """
+    extracted_text, result = _OCR_PIPELINE.submit(
+        image_bytes, lambda text: transliterate_text(text, source_hint)
+    ).wait(OCR_TIMEOUT)
+    return result if result is not None else TransliterationResult(extracted_text)
+
+
+def ocr_and_transliterate_batch(images):
+    """
+    Extract text from several encoded images and transliterate each one to all
+    target scripts.
+
+    The images go through the OCR pipeline together, which stacks same-sized images
+    into batched EasyOCR calls without resizing them.
+
+    Returns:
+        One TransliterationResult per image, in input order. An image that fails (e.g.
+        cannot be decoded) gets a result with error set instead of failing the batch.
+    """
+    jobs = [_OCR_PIPELINE.submit(image_bytes, transliterate_text) for image_bytes in images]
+    
+    results = []
+    for job in jobs:
+        try:
+            extracted_text, result = job.wait(OCR_TIMEOUT)
+        except Exception as e:
+            results.append(TransliterationResult('', error=str(e)))
+            continue
+        results.append(result if result is not None else TransliterationResult(extracted_text))
+    return results
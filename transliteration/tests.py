@@ -1,3 +1,186 @@
-from django.test import TestCase
+import random
+import threading
+import time
+
+import cv2
+import numpy as np
+import regex as re
+from django.test import SimpleTestCase
+
+from .formatters import TransliterationFormatter, _INDIAN_SCRIPT_RE
+from .ocr_service import OCRPipeline
 
 # Create your tests here.
+
+
+class CleanIndianScriptTests(SimpleTestCase):
+    """
+    Pins the output of _clean_indian_script.
+    """
+
+    def setUp(self):
+        self.formatter = TransliterationFormatter()
+
+    def test_capital_before_indian_script_is_lowercased(self):
+        self.assertEqual(self.formatter._clean_indian_script('Aनमस्ते'), 'aनमस्ते')
+
+    def test_capital_after_indian_script_is_lowercased(self):
+        # The old combined pattern had an extra capturing group and replaced the
+        # capital with a copy of the preceding Indian character
+        self.assertEqual(self.formatter._clean_indian_script('नमस्तेB'), 'नमस्तेb')
+
+    def test_capital_between_indian_script_is_lowercased(self):
+        self.assertEqual(self.formatter._clean_indian_script('नAम'), 'नaम')
+
+    def test_standalone_capital_is_lowercased(self):
+        self.assertEqual(self.formatter._clean_indian_script('A नमस्ते'), 'a नमस्ते')
+
+    def test_between_pass_is_redundant(self):
+        # The removed third pass lowercased a capital between two Indian script
+        # characters; the before/after passes must leave nothing for it to match
+        between = re.compile(f'({_INDIAN_SCRIPT_RE.pattern})([A-Z])({_INDIAN_SCRIPT_RE.pattern})')
+        alphabet = 'ABZab नमकதமలగ'
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))
+            cleaned = self.formatter._clean_indian_script(text)
+            self.assertEqual(
+                between.sub(lambda m: m.group(1) + m.group(2).lower() + m.group(3), cleaned),
+                cleaned,
+                msg=repr(text)
+            )
+
+
+class CleanTransliterationTests(SimpleTestCase):
+    """
+    Pins the output of clean_transliteration, including deliberate behaviour changes.
+    """
+
+    def setUp(self):
+        self.formatter = TransliterationFormatter()
+
+    def test_word_corrections_ignore_case(self):
+        for text in ['dIpAvalI', 'dipavali', 'DIPAVALI']:
+            with self.subTest(text=text):
+                self.assertEqual(self.formatter.clean_transliteration(text, 'Tamil'), 'Deepavali')
+
+    def test_roman_output_is_corrected_and_title_cased(self):
+        self.assertEqual(
+            self.formatter.clean_transliteration('dīpāvalī  greetings\n', 'ITRANS'),
+            'Deepavali Greetings'
+        )
+
+    def test_all_indian_script_blocks_are_detected(self):
+        # Bengali, Gurmukhi and Malayalam text now goes through the Indian script cleanup
+        for text, script, expected in [
+            ('নমB', 'Bengali', 'নমb'),
+            ('ਨਮB', 'Gurmukhi', 'ਨਮb'),
+            ('നമB', 'Malayalam', 'നമb'),
+        ]:
+            with self.subTest(script=script):
+                self.assertEqual(self.formatter.clean_transliteration(text, script), expected)
+
+    def test_plain_ascii_only_normalizes_whitespace(self):
+        self.assertEqual(
+            self.formatter.clean_transliteration('  namaste   duniya ', 'Devanagari'),
+            'namaste duniya'
+        )
+
+    def test_information_separators_count_as_whitespace(self):
+        # str.split() treats U+001C-U+001F as whitespace; the regex module's \s does not
+        self.assertEqual(self.formatter.clean_transliteration('ue\x1cO', 'ITRANS'), 'Ue O')
+
+
+def _encode_png(height, width):
+    return cv2.imencode('.png', np.zeros((height, width, 3), dtype=np.uint8))[1].tobytes()
+
+
+class FakeReader:
+    """
+    Stands in for easyocr.Reader: records its calls and returns the image height as text.
+    readtext blocks while the gate is cleared, letting tests queue up jobs behind it.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def readtext(self, image):
+        self.started.set()
+        self.gate.wait()
+        self.calls.append(('readtext', image.shape))
+        return [(None, f'h{image.shape[0]}', 1.0)]
+
+    def readtext_batched(self, images):
+        self.calls.append(('readtext_batched', [image.shape for image in images]))
+        return [[(None, f'h{image.shape[0]}', 1.0)] for image in images]
+
+
+class OCRPipelineTests(SimpleTestCase):
+    """
+    Exercises the OCR pipeline's batching and error handling with a fake reader.
+    """
+
+    def setUp(self):
+        self.reader = FakeReader()
+        self.pipeline = OCRPipeline(self.reader, batch_size=8, max_wait=0.05)
+
+    def _wait_for_queued(self, count):
+        deadline = time.monotonic() + 5
+        while self.pipeline._ocr_queue.qsize() < count:
+            self.assertLess(time.monotonic(), deadline, 'jobs never reached the OCR stage')
+            time.sleep(0.001)
+
+    def test_same_shape_images_are_batched_and_others_read_singly(self):
+        # Hold the OCR stage on a first image while the others queue up behind it
+        self.reader.gate.clear()
+        first = self.pipeline.submit(_encode_png(10, 10))
+        self.assertTrue(self.reader.started.wait(5))
+        jobs = [self.pipeline.submit(_encode_png(height, 40)) for height in (30, 30, 20)]
+        self._wait_for_queued(3)
+        self.reader.gate.set()
+
+        self.assertEqual(first.wait(5), ('h10', None))
+        self.assertEqual([job.wait(5) for job in jobs], [('h30', None), ('h30', None), ('h20', None)])
+        self.assertEqual(self.reader.calls, [
+            ('readtext', (10, 10, 3)),
+            ('readtext_batched', [(30, 40, 3), (30, 40, 3)]),
+            ('readtext', (20, 40, 3)),
+        ])
+
+    def test_process_text_result_is_returned(self):
+        job = self.pipeline.submit(_encode_png(12, 12), str.upper)
+        self.assertEqual(job.wait(5), ('h12', 'H12'))
+
+    def test_decode_error_is_raised_from_wait(self):
+        job = self.pipeline.submit(b'not an image')
+        with self.assertRaisesMessage(ValueError, 'Could not read image'):
+            job.wait(5)
+
+    def test_process_text_error_is_raised_from_wait(self):
+        def fail(text):
+            raise RuntimeError('transliteration failed')
+
+        job = self.pipeline.submit(_encode_png(12, 12), fail)
+        with self.assertRaisesMessage(RuntimeError, 'transliteration failed'):
+            job.wait(5)
+
+    def test_failing_after_ocr_hook_does_not_stall_later_jobs(self):
+        def fail():
+            raise RuntimeError('hook failed')
+
+        pipeline = OCRPipeline(self.reader, after_ocr=fail)
+        self.assertEqual(pipeline.submit(_encode_png(12, 12)).wait(5), ('h12', None))
+        self.assertEqual(pipeline.submit(_encode_png(14, 14)).wait(5), ('h14', None))
+
+    def test_wait_times_out(self):
+        release = threading.Event()
+        job = self.pipeline.submit(_encode_png(12, 12), lambda text: release.wait(5))
+        try:
+            with self.assertRaises(TimeoutError):
+                job.wait(0.05)
+        finally:
+            release.set()
+        self.assertEqual(job.wait(5), ('h12', True))
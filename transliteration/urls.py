@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path('api/transliterate-image/', views.transliterate_image, name='transliterate_image'),
+    path('api/transliterate-batch/', views.transliterate_batch, name='transliterate_batch'),
     path('api/transliterate-single/', views.transliterate_single, name='transliterate_single'),
 ]
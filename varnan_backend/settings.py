@@ -163,6 +163,13 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# fastText language identification model loaded by transliteration/services.py.
+# The model file is not part of the repository: download lid.176.ftz from
+# https://fasttext.cc/docs/en/language-identification.html. Without it (or without the
+# fasttext package from requirements.txt) the app logs a notice at startup and uses
+# langdetect instead
+LANGUAGE_ID_MODEL_PATH = os.getenv('LANGUAGE_ID_MODEL_PATH', BASE_DIR / 'lid.176.ftz')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 